@@ -1,51 +1,89 @@
 import os
-import requests
+import asyncio
+import aiohttp
+import tempfile
 import zipfile
 from urllib.parse import urlparse
-from io import BytesIO
 
-def extract_csvs_from_link(link_location, output_directory):
+def extract_csvs_from_zip(zip_path, output_directory):
+    """
+    Extracts all CSV files from a zip file on disk to the output directory.
+    
+    Args:
+        zip_path (str): Path to a zip file containing CSV files
+        output_directory (str): Path to the directory where CSV files should be extracted
+    """
+    # Check if the content is a zip file
+    if not zipfile.is_zipfile(zip_path):
+        raise ValueError("The downloaded file is not a valid ZIP archive")
+    
+    # Extract CSV files from the zip, preserving the original filenames
+    with zipfile.ZipFile(zip_path) as zip_file:
+        csv_files = [f for f in zip_file.namelist() if f.lower().endswith('.csv')]
+        
+        if not csv_files:
+            raise ValueError("No CSV files found in the ZIP archive")
+        
+        zip_file.extractall(output_directory, members=csv_files)
+        for csv_file in csv_files:
+            print(f"Extracted: {csv_file}")
+    
+    print(f"Successfully extracted {len(csv_files)} CSV files to {output_directory}")
+
+
+async def extract_csvs_from_link(session, link_location, output_directory):
     """
     Downloads a zip file from the given URL and extracts all CSV files to the output directory.
     
     Args:
+        session (aiohttp.ClientSession): Shared HTTP session used for the download
         link_location (str): URL pointing to a zip file containing CSV files
         output_directory (str): Path to the directory where CSV files should be extracted
     """
+    zip_path = None
     try:
         # Create output directory if it doesn't exist
         os.makedirs(output_directory, exist_ok=True)
         
-        # Download the file from the URL
-        response = requests.get(link_location)
-        response.raise_for_status()  # Raise an exception for HTTP errors
+        # Stream the download to a temporary file rather than holding it in memory
+        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp_file:
+            zip_path = tmp_file.name
+            async with session.get(link_location) as response:
+                response.raise_for_status()  # Raise an exception for HTTP errors
+                async for chunk in response.content.iter_chunked(1024 * 1024):
+                    # Disk writes block, so keep them off the event loop like the unzip below
+                    await asyncio.to_thread(tmp_file.write, chunk)
         
-        # Check if the content is a zip file
-        if not zipfile.is_zipfile(BytesIO(response.content)):
-            raise ValueError("The downloaded file is not a valid ZIP archive")
+        # Unzipping is blocking file I/O, keep it off the event loop
+        await asyncio.to_thread(extract_csvs_from_zip, zip_path, output_directory)
         
-        # Extract CSV files from the zip
-        with zipfile.ZipFile(BytesIO(response.content)) as zip_file:
-            csv_files = [f for f in zip_file.namelist() if f.lower().endswith('.csv')]
-            
-            if not csv_files:
-                raise ValueError("No CSV files found in the ZIP archive")
-                
-            for csv_file in csv_files:
-                # Extract to output directory, preserving the original filename
-                zip_file.extract(csv_file, output_directory)
-                print(f"Extracted: {csv_file}")
-                
-        print(f"Successfully extracted {len(csv_files)} CSV files to {output_directory}")
-        
-    except requests.exceptions.RequestException as e:
+    except asyncio.TimeoutError:
+        # Timeout errors carry no message, so say what timed out
+        print(f"Error downloading the file: timed out fetching {link_location}")
+    except aiohttp.ClientError as e:
         print(f"Error downloading the file: {e}")
     except zipfile.BadZipFile:
         print("Error: The downloaded file is not a valid ZIP archive or is corrupted")
     except Exception as e:
         print(f"An error occurred: {e}")
+    finally:
+        if zip_path and os.path.exists(zip_path):
+            os.remove(zip_path)
+
+
+async def main(list_years):
+    """Download and extract every year's zip concurrently"""
+    # No overall limit, since big years take a while on slow links, but give up on stalled sockets
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with asyncio.TaskGroup() as tg:
+            for i in list_years:
+                tg.create_task(extract_csvs_from_link(
+                    session,
+                    f"https://www.retrosheet.org/downloads/{i}/{i}csvs.zip",
+                    f"./output_data/{i}"
+                ))
 
 
 list_years = [2024, 2023, 2022, 2021, 2020]
-for i in list_years:
-    extract_csvs_from_link(f"https://www.retrosheet.org/downloads/{i}/{i}csvs.zip", f"./output_data/{i}")
\ No newline at end of file
+asyncio.run(main(list_years))
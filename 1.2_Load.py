@@ -1,8 +1,285 @@
 import os
+import hashlib
 import sqlite3
 import pandas as pd
 from glob import glob
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional, pandas is used when it's missing
+    pa = None
+
+# Rows handed to executemany at a time by the Python-side loaders
+CHUNK_SIZE = 50_000
+
+def _sqlite_type(dtype):
+    """Map a pandas dtype to the SQLite column type pandas' to_sql would use."""
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _arrow_sqlite_type(arrow_type):
+    """Map an Arrow type to the SQLite column type pandas' to_sql would use for it."""
+    if pa.types.is_boolean(arrow_type) or pa.types.is_integer(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type) or pa.types.is_null(arrow_type):
+        return "REAL"
+    return "TEXT"
+
+
+def _prepare_table(conn, table_name, columns_sql, if_exists):
+    """Create the destination table, honouring the to_sql-style if_exists option."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;",
+        (table_name,)
+    ).fetchone()
+    if exists and if_exists == "fail":
+        raise ValueError(f"Table '{table_name}' already exists")
+    if if_exists == "replace":
+        conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns_sql})')
+
+
+def _file_fingerprint(path, sample_size=64 * 1024):
+    """
+    Cheap identity for a CSV: size, mtime and a SHA-1 of its first and last 64KB.
+    
+    Returns:
+        tuple: (size, mtime, sha1 hex digest)
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        digest.update(f.read(sample_size))
+        if stat.st_size > sample_size:
+            f.seek(max(stat.st_size - sample_size, sample_size))
+            digest.update(f.read())
+    return stat.st_size, stat.st_mtime, digest.hexdigest()
+
+
+def _is_unchanged(conn, csv_file, table_name, fingerprint):
+    """Check the load manifest for an identical previous load whose table still exists."""
+    row = conn.execute(
+        "SELECT size, mtime, sha1 FROM _load_manifest WHERE file=?;",
+        (csv_file,)
+    ).fetchone()
+    if row is None or tuple(row) != fingerprint:
+        return False
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;",
+        (table_name,)
+    ).fetchone() is not None
+
+
+def _load_csv_extension(conn):
+    """Try to load SQLite's csv virtual table extension. Returns True if available."""
+    try:
+        conn.enable_load_extension(True)
+    except AttributeError:
+        # Python was built without extension loading support
+        return False
+    try:
+        conn.load_extension("csv")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.enable_load_extension(False)
+
+
+def _csv_import_columns(conn, columns):
+    """
+    Work out how pandas would type each column of temp.csv_import, using one aggregate pass.
+    
+    Returns:
+        list: (SQLite column type, SELECT expression) per column
+    """
+    booleans = "('True', 'TRUE', 'true', 'False', 'FALSE', 'false')"
+    checks = []
+    for col in columns:
+        value = f'NULLIF("{col}", \'\')'
+        checks += [
+            f"COUNT({value})",
+            f"COUNT(*) - COUNT({value})",
+            # Comparing with a REAL applies NUMERIC affinity, which only converts well-formed numbers
+            f"COUNT(CASE WHEN {value} = CAST({value} AS REAL) AND {value} NOT GLOB '*[.eE]*' THEN 1 END)",
+            f"COUNT(CASE WHEN {value} = CAST({value} AS REAL) THEN 1 END)",
+            f"COUNT(CASE WHEN {value} IN {booleans} THEN 1 END)",
+        ]
+    stats = conn.execute(f"SELECT {', '.join(checks)} FROM temp.csv_import").fetchone()
+    
+    result = []
+    for i, col in enumerate(columns):
+        values, nulls, integers, numbers, flags = stats[i * 5:i * 5 + 5]
+        value = f'NULLIF("{col}", \'\')'
+        if values and integers == values and not nulls:
+            result.append(("INTEGER", value))
+        elif numbers == values:
+            # Includes all-empty columns, which pandas reads as float NaN
+            result.append(("REAL", value))
+        elif flags == values:
+            result.append(("INTEGER", f"CASE WHEN {value} IN ('True', 'TRUE', 'true') THEN 1 WHEN {value} IS NOT NULL THEN 0 END"))
+        else:
+            result.append(("TEXT", value))
+    return result
+
+
+def _load_csv_native(conn, csv_file, table_name, if_exists):
+    """
+    Load a CSV through SQLite's csv virtual table so rows are parsed in C.
+    Column types follow the same rules as _infer_csv_dtypes and empty fields become NULL.
+    
+    Returns:
+        int: Number of rows loaded
+    """
+    filename = csv_file.replace("'", "''")
+    conn.execute("DROP TABLE IF EXISTS temp.csv_import")
+    conn.execute(f"CREATE VIRTUAL TABLE temp.csv_import USING csv(filename='{filename}', header=YES)")
+    try:
+        columns = [col[1] for col in conn.execute("PRAGMA temp.table_info(csv_import)")]
+        column_types = _csv_import_columns(conn, columns)
+        columns_sql = ', '.join(f'"{col}" {col_type}' for col, (col_type, _) in zip(columns, column_types))
+        _prepare_table(conn, table_name, columns_sql, if_exists)
+        select_sql = ', '.join(expr for _, expr in column_types)
+        cursor = conn.execute(f'INSERT INTO "{table_name}" SELECT {select_sql} FROM temp.csv_import')
+        return cursor.rowcount
+    finally:
+        conn.execute("DROP TABLE temp.csv_import")
+
+
+def _arrow_nullable_columns(csv_file, read_options, columns):
+    """Stream just the given columns of a CSV and return the ones containing any NULLs."""
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True, include_columns=columns)
+    nullable = set()
+    for batch in pacsv.open_csv(csv_file, read_options=read_options, convert_options=convert_options):
+        nullable.update(name for name, column in zip(batch.schema.names, batch.columns) if column.null_count)
+    return nullable
+
+
+def _load_csv_arrow(conn, csv_file, table_name, if_exists):
+    """
+    Load a CSV by streaming Arrow record batches, so parsing runs in pyarrow's C++ reader.
+    
+    Returns:
+        int: Number of rows loaded
+    """
+    # Large blocks so type inference on the first block covers most of the file
+    # Empty fields become NULL, as they do with pandas
+    read_options = pacsv.ReadOptions(block_size=64 << 20)
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+    reader = pacsv.open_csv(csv_file, read_options=read_options, convert_options=convert_options)
+    
+    # pandas leaves dates and times as the original text, so reread those columns as strings
+    column_types = {
+        field.name: pa.string() for field in reader.schema if pa.types.is_temporal(field.type)
+    }
+    # pandas reads integer columns with gaps as float64, so find those before declaring the table
+    int_columns = [field.name for field in reader.schema if pa.types.is_integer(field.type)]
+    reader.close()
+    if int_columns:
+        column_types.update(
+            (name, pa.float64()) for name in _arrow_nullable_columns(csv_file, read_options, int_columns)
+        )
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True, column_types=column_types)
+    reader = pacsv.open_csv(csv_file, read_options=read_options, convert_options=convert_options)
+    schema = reader.schema
+    
+    columns_sql = ', '.join(f'"{field.name}" {_arrow_sqlite_type(field.type)}' for field in schema)
+    _prepare_table(conn, table_name, columns_sql, if_exists)
+    placeholders = ', '.join('?' * len(schema))
+    insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
+    
+    row_count = 0
+    for batch in reader:
+        # Convert to Python objects a slice at a time so a whole block is never materialised
+        for start in range(0, batch.num_rows, CHUNK_SIZE):
+            rows = batch.slice(start, CHUNK_SIZE)
+            conn.executemany(insert_sql, zip(*(column.to_pylist() for column in rows.columns)))
+        row_count += batch.num_rows
+    
+    return row_count
+
+
+def _infer_csv_dtypes(csv_file):
+    """
+    Scan a CSV in chunks and work out the dtype pandas would infer for each column
+    if it read the whole file at once.
+    
+    Returns:
+        dict: Column name to 'int64', 'float64', 'bool' or 'object'
+    """
+    kinds = {}
+    has_nulls = {}
+    for chunk in pd.read_csv(csv_file, low_memory=False, chunksize=CHUNK_SIZE):
+        for col in chunk.columns:
+            series = chunk[col]
+            nulls = series.isna()
+            has_nulls[col] = has_nulls.get(col, False) or bool(nulls.any())
+            kinds.setdefault(col, set())
+            # An all-empty chunk says nothing about the column's type
+            if nulls.all():
+                continue
+            # pandas reads true/false with gaps as an object column of bools
+            if pd.api.types.infer_dtype(series, skipna=True) == 'boolean':
+                kinds[col].add('b')
+            else:
+                kinds[col].add(series.dtype.kind)
+    
+    dtypes = {}
+    for col, col_kinds in kinds.items():
+        if col_kinds == {'i'} and not has_nulls[col]:
+            dtypes[col] = 'int64'
+        elif col_kinds <= {'i', 'f'}:
+            # Includes all-empty columns, which pandas reads as float NaN
+            dtypes[col] = 'float64'
+        elif col_kinds == {'b'}:
+            dtypes[col] = 'bool'
+        else:
+            dtypes[col] = 'object'
+    return dtypes
+
+
+def _load_csv_chunked(conn, csv_file, table_name, if_exists):
+    """
+    Load a CSV by streaming it through pandas in chunks and inserting with executemany.
+    Column types come from a first pass over the whole file, so they match a single read_csv.
+    
+    Returns:
+        int: Number of rows loaded
+    """
+    dtypes = _infer_csv_dtypes(csv_file)
+    
+    # Force the whole-file dtypes so every chunk converts values the same way
+    read_dtypes = {col: str for col, dtype in dtypes.items() if dtype == 'object'}
+    read_dtypes.update({col: 'float64' for col, dtype in dtypes.items() if dtype == 'float64'})
+    reader = pd.read_csv(csv_file, low_memory=False, chunksize=CHUNK_SIZE, dtype=read_dtypes)
+    
+    row_count = 0
+    insert_sql = None
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        
+        if insert_sql is None:
+            columns_sql = ', '.join(
+                f'"{col}" {_sqlite_type(dtypes[col])}' for col in chunk.columns
+            )
+            _prepare_table(conn, table_name, columns_sql, if_exists)
+            placeholders = ', '.join('?' * len(chunk.columns))
+            insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
+        
+        # Convert numpy scalars to Python objects and NaN to NULL
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        conn.executemany(insert_sql, chunk.itertuples(index=False, name=None))
+        row_count += len(chunk)
+    
+    return row_count
+
+
 def csv_to_sqlite(csv_directory, db_path, if_exists="replace"):
     """
     Reads all CSV files in a directory and uploads each as a separate table to SQLite database.
@@ -24,6 +301,27 @@ def csv_to_sqlite(csv_directory, db_path, if_exists="replace"):
     try:
         # Connect to SQLite database
         conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=OFF;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-200000;
+            CREATE TABLE IF NOT EXISTS _load_manifest(
+                file TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                sha1 TEXT
+            );
+        """)
+        
+        # Prefer SQLite's own CSV parser, then pyarrow's, with pandas as the last resort.
+        # Each entry lists the errors that mean "this loader can't parse it, try the next one".
+        loaders = []
+        if _load_csv_extension(conn):
+            loaders.append(("Native CSV import", _load_csv_native, (sqlite3.Error,)))
+        if pa is not None:
+            loaders.append(("Arrow CSV import", _load_csv_arrow, (pa.ArrowInvalid,)))
+        loaders.append(("pandas CSV import", _load_csv_chunked, ()))
         
         # Find all CSV files in the directory
         csv_files = glob(os.path.join(csv_directory, "*.csv"))
@@ -41,25 +339,44 @@ def csv_to_sqlite(csv_directory, db_path, if_exists="replace"):
             table_name = ''.join(c if c.isalnum() else '_' for c in table_name)
             
             try:
-                # Read CSV (with low_memory=False to avoid mixed type warnings)
-                df = pd.read_csv(csv_file, low_memory=False)
+                # Skip files that haven't changed since they were last loaded
+                fingerprint = _file_fingerprint(csv_file)
+                manifest_key = os.path.abspath(csv_file)
+                if _is_unchanged(conn, manifest_key, table_name, fingerprint):
+                    result['skipped'].append({
+                        'file': base_name,
+                        'reason': 'Unchanged since last load'
+                    })
+                    print(f"Skipped: {base_name} (unchanged)")
+                    continue
+                
+                for loader_name, loader, fallback_errors in loaders:
+                    conn.execute("BEGIN")
+                    try:
+                        row_count = loader(conn, csv_file, table_name, if_exists)
+                        break
+                    except fallback_errors as e:
+                        conn.rollback()
+                        print(f"{loader_name} failed for {base_name} ({e}), trying next loader")
+                    except Exception:
+                        conn.rollback()
+                        raise
                 
-                if df.empty:
+                if row_count == 0:
+                    conn.rollback()
                     result['skipped'].append({
                         'file': base_name,
                         'reason': 'Empty CSV'
                     })
                     continue
                 
-                # Upload to SQLite
-                df.to_sql(
-                    name=table_name,
-                    con=conn,
-                    if_exists=if_exists,
-                    index=False
+                # Record the file in the same transaction as its rows
+                conn.execute(
+                    "INSERT OR REPLACE INTO _load_manifest (file, size, mtime, sha1) VALUES (?, ?, ?, ?);",
+                    (manifest_key, *fingerprint)
                 )
+                conn.commit()
                 
-                row_count = len(df)
                 result['success'].append({
                     'file': base_name,
                     'table': table_name,
@@ -98,10 +415,11 @@ def csv_to_sqlite(csv_directory, db_path, if_exists="replace"):
     return result
 
 
-list_years = [2024, 2023, 2022, 2021, 2020]
-for i in list_years:
-    csv_to_sqlite(
-        csv_directory=f"./output_data/{i}", 
-        db_path="./baseball-database.db",
-        if_exists="replace"
-    )
\ No newline at end of file
+if __name__ == "__main__":
+    list_years = [2024, 2023, 2022, 2021, 2020]
+    for i in list_years:
+        csv_to_sqlite(
+            csv_directory=f"./output_data/{i}", 
+            db_path="./baseball-database.db",
+            if_exists="replace"
+        )
\ No newline at end of file
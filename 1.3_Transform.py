@@ -1,28 +1,47 @@
 import sqlite3
-import re
 
 def combine_tables_with_union(db_path):
     """
-    Combine tables with pattern YYYYsuffix using CREATE TABLE AS SELECT with UNION ALL.
+    Combine tables with pattern YYYYsuffix into one table per suffix, inserting one year at a time.
     Properly handles table names that start with numbers.
     """
     conn = sqlite3.connect(db_path)
+    conn.executescript("PRAGMA temp_store=MEMORY; PRAGMA cache_size=-500000;")
     cursor = conn.cursor()
     
-    # Get all table names
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
+    # Get all table names and their columns in one pass over the schema
+    cursor.execute("""
+        SELECT m.name, p.name
+        FROM sqlite_master m
+        JOIN pragma_table_info(m.name) p
+        WHERE m.type='table'
+        ORDER BY m.rowid, p.cid
+    """)
+    table_columns = {}
+    for table, column in cursor.fetchall():
+        table_columns.setdefault(table, []).append(column)
+    tables = list(table_columns)
     
     # Group tables by suffix
     suffix_groups = {}
     for table in tables:
-        if re.match(r'^\d{4}.+$', table):  # Tables starting with 4 digits
-            suffix = table[4:]
-            if suffix not in suffix_groups:
-                suffix_groups[suffix] = []
-            suffix_groups[suffix].append(table)
+        if len(table) > 4 and table[:4].isdigit():  # Tables starting with 4 digits
+            suffix_groups.setdefault(table[4:], []).append(table)
     
-    # Process each suffix group
+    # Process every suffix group in a single transaction
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _combine_suffix_groups(cursor, suffix_groups, table_columns)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print("\nAll tables processed successfully")
+
+def _combine_suffix_groups(cursor, suffix_groups, table_columns):
+    """Create one combined table per suffix group using the cached column lists"""
     for suffix, year_tables in suffix_groups.items():
         if len(year_tables) < 2:
             print(f"Skipping '{suffix}' - only 1 table found")
@@ -34,37 +53,31 @@ def combine_tables_with_union(db_path):
         # 1. Drop the combined table if it exists
         cursor.execute(f"DROP TABLE IF EXISTS \"{combined_table}\"")
         
-        # 2. Build the UNION ALL query for all tables
-        union_parts = []
+        # 2. Build one SELECT per year table with its year literal.
+        # Year tables normally share a schema, so the column list is built once per group.
+        group_columns = table_columns[year_tables[0]]
+        group_columns_str = ', '.join(f'"{col}"' for col in group_columns)  # Quote column names too
+        year_selects = []
         for table in year_tables:
             year = table[:4]
-            # Use quoted table name in PRAGMA statement
-            cursor.execute(f'PRAGMA table_info("{table}")')
-            columns = [col[1] for col in cursor.fetchall()]
-            columns_str = ', '.join(f'"{col}"' for col in columns)  # Quote column names too
-            
-            # Create SELECT statement for this table with year literal
-            union_part = f'SELECT {columns_str}, {year} AS source_year FROM "{table}"'
-            union_parts.append(union_part)
-        
-        full_union = " UNION ALL ".join(union_parts)
+            columns = table_columns[table]
+            if columns == group_columns:
+                columns_str = group_columns_str
+            else:
+                columns_str = ', '.join(f'"{col}"' for col in columns)
+            year_selects.append((table, f'SELECT {columns_str}, {year} AS source_year FROM "{table}"'))
         
-        # 3. Create the new table with all data in one operation
-        create_sql = f"""
-        CREATE TABLE "{combined_table}" AS
-        {full_union}
-        """
-        cursor.execute(create_sql)
+        # 3. Create the empty table from the first year's shape, then stream each year in
+        cursor.execute(f'CREATE TABLE "{combined_table}" AS {year_selects[0][1]} WHERE 0')
+        for table, select_sql in year_selects:
+            cursor.execute(f'INSERT INTO "{combined_table}" {select_sql}')
+            print(f"Inserted {cursor.rowcount} rows from {table}")
         print(f"Created {combined_table} with all combined data")
         
         # 4. Verify counts
         cursor.execute(f'SELECT COUNT(*) FROM "{combined_table}"')
         total_rows = cursor.fetchone()[0]
         print(f"Total rows in {combined_table}: {total_rows}")
-    
-    conn.commit()
-    conn.close()
-    print("\nAll tables processed successfully")
 
 if __name__ == "__main__":
     database_path = "baseball-database.db"  # Change to your DB path
@@ -1,39 +1,137 @@
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
+
+# Query text is kept constant so sqlite3's per-connection statement cache can reuse the plan
+PLAYER_STATS_SQL = """
+SELECT 
+    p.player_name,
+    p.batting_hand,
+    SUM(b.plate_appearances) AS PA,
+    SUM(b.at_bats) AS AB,
+    SUM(b.hits) AS H,
+    SUM(b.home_runs) AS HR,
+    SUM(b.rbi) AS RBI,
+    SUM(b.stolen_bases) AS SB,
+    ROUND(SUM(b.hits)*1.0/NULLIF(SUM(b.at_bats), 0), 3) AS AVG
+FROM DimPlayer p
+JOIN FactBatting b ON p.player_id = b.player_id
+WHERE (? IS NULL OR p.player_name LIKE ?)
+  AND (? IS NULL OR strftime('%Y', b.game_date) = ?)
+GROUP BY p.player_id
+ORDER BY SUM(b.hits) DESC
+LIMIT ?;
+"""
+
+# Away and home games are split so each branch can seek on its team index
+_TEAM_PERFORMANCE_TEMPLATE = """
+SELECT 
+    team_id,
+    COUNT(*) AS games_played,
+    SUM(win) AS wins,
+    SUM(loss) AS losses,
+    SUM(tie) AS ties,
+    SUM(runs_scored) AS runs_scored,
+    SUM(runs_allowed) AS runs_allowed,
+    ROUND(AVG(attendance)) AS avg_attendance
+FROM (
+    SELECT
+        visiting_team_id AS team_id,
+        visiting_win AS win,
+        CASE WHEN visiting_win = 0 AND tie = 0 THEN 1 ELSE 0 END AS loss,
+        tie,
+        visiting_runs AS runs_scored,
+        home_runs AS runs_allowed,
+        attendance
+    FROM FactGameOutcomes
+    WHERE visiting_team_id = ?{season_filter}
+    UNION ALL
+    SELECT
+        home_team_id AS team_id,
+        home_win AS win,
+        CASE WHEN home_win = 0 AND tie = 0 THEN 1 ELSE 0 END AS loss,
+        tie,
+        home_runs AS runs_scored,
+        visiting_runs AS runs_allowed,
+        attendance
+    FROM FactGameOutcomes
+    WHERE home_team_id = ?{season_filter}
+)
+GROUP BY team_id;
+"""
+TEAM_PERFORMANCE_SQL = _TEAM_PERFORMANCE_TEMPLATE.format(season_filter="")
+TEAM_PERFORMANCE_BY_SEASON_SQL = _TEAM_PERFORMANCE_TEMPLATE.format(season_filter=" AND season = ?")
 
 class BaseballDataWarehouse:
     def __init__(self, db_path):
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self._known_tables = set()
         
     def connect(self):
         """Connect to the SQLite database"""
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        # Tune for the bulk-build workload: no per-commit fsyncs or mid-build WAL
+        # checkpoints, ~1GB page cache, memory-mapped reads and a single exclusive writer
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA wal_autocheckpoint=0;
+            PRAGMA synchronous=OFF;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-1048576;
+            PRAGMA mmap_size=30000000000;
+            PRAGMA locking_mode=EXCLUSIVE;
+        """)
         self.cursor = self.conn.cursor()
+        self._known_tables = set()
         print(f"Connected to database: {self.db_path}")
         
     def close(self):
         """Close the database connection"""
         if self.conn:
+            # Auto-checkpointing is off, so fold the WAL back into the database here
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
             self.conn.close()
+            self.conn = None
             print("Database connection closed")
             
     def execute_query(self, query, params=None, fetch=True):
-        """Execute a SQL query and optionally return results"""
+        """Execute a SQL query and optionally return results; callers control commits"""
+        # Inside a caller's transaction, a savepoint lets a failing statement roll back on its own
+        in_transaction = self.conn.in_transaction
         try:
+            if in_transaction:
+                self.conn.execute("SAVEPOINT execute_query")
             if params:
                 self.cursor.execute(query, params)
             else:
                 self.cursor.execute(query)
-            self.conn.commit()  # Ensure changes are saved
-            return self.cursor.fetchall() if fetch else None
+            results = self.cursor.fetchall() if fetch else None
+            if in_transaction:
+                self.conn.execute("RELEASE execute_query")
+            return results
         except sqlite3.Error as e:
             print(f"Error executing query: {e}\nQuery: {query}")
-            self.conn.rollback()  # Rollback on error
+            if in_transaction:
+                # Undo only this statement and keep the rest of the caller's transaction
+                self.conn.execute("ROLLBACK TO execute_query")
+                self.conn.execute("RELEASE execute_query")
+            else:
+                self.conn.rollback()  # Rollback on error
             return None
 
+    def _table_exists(self, table):
+        """Check whether a table exists, remembering hits for the life of the connection"""
+        if table not in self._known_tables:
+            result = self.execute_query(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?;",
+                (table,)
+            )
+            if result:
+                self._known_tables.add(table)
+        return table in self._known_tables
+
     def build_data_warehouse(self):
         """Build the complete data warehouse"""
         print("\nStarting data warehouse build...")
@@ -47,10 +145,23 @@ class BaseballDataWarehouse:
                 print("Aborting build due to missing source tables")
                 return
             
-            # Create all tables with explicit error checking
+            # Index join keys on the source tables before building from them
+            self._create_source_indexes()
+            
+            # Create all tables with explicit error checking, one transaction per phase
+            self.conn.execute("BEGIN")
             self._create_dimension_tables()
+            self.conn.commit()
+            
+            self.conn.execute("BEGIN")
             self._create_fact_tables()
+            self._create_aggregates()
+            self.conn.commit()
+            
+            # Indexes go on only after the fact tables are fully loaded
+            self.conn.execute("BEGIN")
             self._create_indexes()
+            self.conn.commit()
             
             # Verify counts
             self._verify_table_counts()
@@ -70,11 +181,7 @@ class BaseballDataWarehouse:
         missing_tables = []
         
         for table in required_tables:
-            result = self.execute_query(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?;", 
-                (table,)
-            )
-            if not result:
+            if not self._table_exists(table):
                 missing_tables.append(table)
         
         if missing_tables:
@@ -82,6 +189,21 @@ class BaseballDataWarehouse:
             return False
         return True
 
+    def _create_source_indexes(self):
+        """Index source table join keys so fact table joins can seek instead of scan"""
+        print("\nCreating source table indexes...")
+        
+        self.execute_query("CREATE INDEX IF NOT EXISTS ix_gameinfo_gid ON gameinfo(gid);", fetch=False)
+        self.execute_query("CREATE INDEX IF NOT EXISTS ix_batting_gid ON batting(gid);", fetch=False)
+        self.execute_query("CREATE INDEX IF NOT EXISTS ix_pitching_gid ON pitching(gid);", fetch=False)
+        
+        # Refresh planner statistics for just these tables so the new indexes are used
+        self.execute_query("ANALYZE gameinfo;", fetch=False)
+        self.execute_query("ANALYZE batting;", fetch=False)
+        self.execute_query("ANALYZE pitching;", fetch=False)
+        
+        print("Created source table indexes")
+
     def _create_dimension_tables(self):
         """Create all dimension tables with error checking"""
         print("\nCreating dimension tables...")
@@ -111,12 +233,12 @@ class BaseballDataWarehouse:
         self.execute_query("""
         CREATE TABLE DimTeam AS
         SELECT DISTINCT team AS team_id FROM (
-            SELECT team FROM allplayers UNION
-            SELECT visteam FROM gameinfo UNION
-            SELECT hometeam FROM gameinfo UNION
-            SELECT team FROM teamstats UNION
-            SELECT team FROM batting UNION
-            SELECT team FROM pitching UNION
+            SELECT team FROM allplayers UNION ALL
+            SELECT visteam FROM gameinfo UNION ALL
+            SELECT hometeam FROM gameinfo UNION ALL
+            SELECT team FROM teamstats UNION ALL
+            SELECT team FROM batting UNION ALL
+            SELECT team FROM pitching UNION ALL
             SELECT team FROM fielding
         );
         """, fetch=False)
@@ -192,23 +314,27 @@ class BaseballDataWarehouse:
         );
         """, fetch=False)
         
-        current_date = datetime.strptime(min_date, "%Y-%m-%d").date()
-        end_date = datetime.strptime(max_date, "%Y-%m-%d").date()
-        
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            year = current_date.year
-            month = current_date.month
-            day = current_date.day
-            day_of_week = current_date.weekday()
-            week_of_year = current_date.isocalendar()[1]
-            season_period = "Regular" if 3 <= month <= 10 else "Offseason"
-            
-            self.execute_query("""
-            INSERT INTO DimDate VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (date_str, date_str, year, month, day, day_of_week, week_of_year, season_period), fetch=False)
-            
-            current_date += timedelta(days=1)
+        # Generate every calendar day in SQLite itself rather than inserting row by row.
+        # day_of_week is Monday=0 and week_of_year is the ISO week (week of that week's Thursday).
+        self.execute_query("""
+        INSERT INTO DimDate
+        WITH RECURSIVE d(dt) AS (
+            SELECT date(?)
+            UNION ALL
+            SELECT date(dt, '+1 day') FROM d WHERE dt < date(?)
+        )
+        SELECT
+            dt AS date_id,
+            dt AS date,
+            CAST(strftime('%Y', dt) AS INTEGER) AS year,
+            CAST(strftime('%m', dt) AS INTEGER) AS month,
+            CAST(strftime('%d', dt) AS INTEGER) AS day,
+            (CAST(strftime('%w', dt) AS INTEGER) + 6) % 7 AS day_of_week,
+            (CAST(strftime('%j', date(dt, '-3 days', 'weekday 4')) AS INTEGER) - 1) / 7 + 1 AS week_of_year,
+            CASE WHEN CAST(strftime('%m', dt) AS INTEGER) BETWEEN 3 AND 10
+                 THEN 'Regular' ELSE 'Offseason' END AS season_period
+        FROM d;
+        """, (min_date, max_date), fetch=False)
         
         print("Created all dimension tables")
 
@@ -294,24 +420,24 @@ class BaseballDataWarehouse:
         result = self.execute_query("SELECT COUNT(*) FROM FactPitching;")
         print(f"FactPitching created with {result[0][0] if result else 0} records")
         
-        # FactGameOutcomes
+        # FactGameOutcomes (reuses DimGame rather than scanning gameinfo a second time)
         print("Creating FactGameOutcomes...")
         self.execute_query("""
         CREATE TABLE FactGameOutcomes AS
         SELECT
-            g.gid AS game_id,
-            g.date AS game_date,
+            g.game_id,
+            g.game_date,
             g.season,
-            g.visteam AS visiting_team_id,
-            g.hometeam AS home_team_id,
-            g.vruns AS visiting_runs,
-            g.hruns AS home_runs,
-            CASE WHEN g.vruns > g.hruns THEN 1 ELSE 0 END AS visiting_win,
-            CASE WHEN g.hruns > g.vruns THEN 1 ELSE 0 END AS home_win,
-            CASE WHEN g.vruns = g.hruns THEN 1 ELSE 0 END AS tie,
-            g.timeofgame AS game_duration_minutes,
+            g.visiting_team_id,
+            g.home_team_id,
+            g.visitor_runs AS visiting_runs,
+            g.home_runs,
+            CASE WHEN g.visitor_runs > g.home_runs THEN 1 ELSE 0 END AS visiting_win,
+            CASE WHEN g.home_runs > g.visitor_runs THEN 1 ELSE 0 END AS home_win,
+            CASE WHEN g.visitor_runs = g.home_runs THEN 1 ELSE 0 END AS tie,
+            g.game_duration_minutes,
             g.attendance
-        FROM gameinfo g;
+        FROM DimGame g;
         """, fetch=False)
         
         # Verify FactGameOutcomes was created
@@ -320,6 +446,57 @@ class BaseballDataWarehouse:
         
         print("Created all fact tables")
 
+    def _create_aggregates(self):
+        """Create per-player career aggregates so reporting queries skip the fact tables"""
+        print("\nCreating aggregate tables...")
+        
+        self.execute_query("DROP TABLE IF EXISTS AggPlayerBatting;", fetch=False)
+        self.execute_query("DROP TABLE IF EXISTS AggPlayerPitching;", fetch=False)
+        
+        # AggPlayerBatting
+        print("Creating AggPlayerBatting...")
+        self.execute_query("""
+        CREATE TABLE AggPlayerBatting AS
+        SELECT
+            player_id,
+            COUNT(*) AS games,
+            SUM(plate_appearances) AS plate_appearances,
+            SUM(at_bats) AS at_bats,
+            SUM(hits) AS hits,
+            SUM(doubles) AS doubles,
+            SUM(triples) AS triples,
+            SUM(home_runs) AS home_runs,
+            SUM(rbi) AS rbi,
+            SUM(walks) AS walks,
+            SUM(strikeouts) AS strikeouts,
+            SUM(stolen_bases) AS stolen_bases
+        FROM FactBatting
+        GROUP BY player_id;
+        """, fetch=False)
+        
+        # AggPlayerPitching
+        print("Creating AggPlayerPitching...")
+        self.execute_query("""
+        CREATE TABLE AggPlayerPitching AS
+        SELECT
+            player_id,
+            COUNT(*) AS games,
+            SUM(outs_recorded) AS outs_recorded,
+            SUM(batters_faced) AS batters_faced,
+            SUM(hits_allowed) AS hits_allowed,
+            SUM(earned_runs) AS earned_runs,
+            SUM(walks_allowed) AS walks_allowed,
+            SUM(strikeouts) AS strikeouts,
+            SUM(home_runs_allowed) AS home_runs_allowed,
+            SUM(is_winning_pitcher) AS wins,
+            SUM(is_losing_pitcher) AS losses,
+            SUM(is_save) AS saves
+        FROM FactPitching
+        GROUP BY player_id;
+        """, fetch=False)
+        
+        print("Created all aggregate tables")
+
     def _create_indexes(self):
         """Create performance indexes"""
         print("\nCreating indexes...")
@@ -340,6 +517,20 @@ class BaseballDataWarehouse:
         self.execute_query("CREATE INDEX IF NOT EXISTS idx_fact_pitching_game ON FactPitching(game_id);", fetch=False)
         self.execute_query("CREATE INDEX IF NOT EXISTS idx_fact_pitching_player ON FactPitching(player_id);", fetch=False)
         self.execute_query("CREATE INDEX IF NOT EXISTS idx_fact_outcomes_game ON FactGameOutcomes(game_id);", fetch=False)
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_fact_outcomes_visiting ON FactGameOutcomes(visiting_team_id, season);", fetch=False)
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_fact_outcomes_home ON FactGameOutcomes(home_team_id, season);", fetch=False)
+        
+        # Aggregate tables indexes
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_agg_batting_player ON AggPlayerBatting(player_id);", fetch=False)
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_agg_pitching_player ON AggPlayerPitching(player_id);", fetch=False)
+        
+        # Gather planner statistics for the newly indexed tables only
+        for table in [
+            "DimPlayer", "DimTeam", "DimGame",
+            "FactBatting", "FactPitching", "FactGameOutcomes",
+            "AggPlayerBatting", "AggPlayerPitching"
+        ]:
+            self.execute_query(f"ANALYZE {table};", fetch=False)
         
         print("Created indexes")
 
@@ -349,7 +540,8 @@ class BaseballDataWarehouse:
         
         tables = [
             "DimPlayer", "DimTeam", "DimGame", "DimDate",
-            "FactBatting", "FactPitching", "FactGameOutcomes"
+            "FactBatting", "FactPitching", "FactGameOutcomes",
+            "AggPlayerBatting", "AggPlayerPitching"
         ]
         
         for table in tables:
@@ -365,41 +557,15 @@ class BaseballDataWarehouse:
     def query_player_stats(self, player_name=None, season=None, limit=5):
         """Get player statistics with optional filters"""
         # First check if FactBatting exists
-        result = self.execute_query(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='FactBatting';"
-        )
-        if not result:
+        if not self._table_exists('FactBatting'):
             print("Error: FactBatting table does not exist")
             return []
         
-        query = """
-        SELECT 
-            p.player_name,
-            p.batting_hand,
-            SUM(b.plate_appearances) AS PA,
-            SUM(b.at_bats) AS AB,
-            SUM(b.hits) AS H,
-            SUM(b.home_runs) AS HR,
-            SUM(b.rbi) AS RBI,
-            SUM(b.stolen_bases) AS SB,
-            ROUND(SUM(b.hits)*1.0/NULLIF(SUM(b.at_bats), 0), 3) AS AVG
-        FROM DimPlayer p
-        JOIN FactBatting b ON p.player_id = b.player_id
-        WHERE 1=1
-        """
-        
-        params = []
-        if player_name:
-            query += " AND p.player_name LIKE ?"
-            params.append(f"%{player_name}%")
-        if season:
-            query += " AND strftime('%Y', b.game_date) = ?"
-            params.append(str(season))
-            
-        query += " GROUP BY p.player_id ORDER BY SUM(b.hits) DESC LIMIT ?;"
-        params.append(limit)
+        name_pattern = f"%{player_name}%" if player_name else None
+        season_str = str(season) if season else None
+        params = [name_pattern, name_pattern, season_str, season_str, limit]
         
-        results = self.execute_query(query, params)
+        results = self.execute_query(PLAYER_STATS_SQL, params)
         if not results:
             print("No player stats found")
             return []
@@ -409,38 +575,15 @@ class BaseballDataWarehouse:
     def query_team_performance(self, team_id, season=None):
         """Get team performance summary"""
         # First check if FactGameOutcomes exists
-        result = self.execute_query(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='FactGameOutcomes';"
-        )
-        if not result:
+        if not self._table_exists('FactGameOutcomes'):
             print("Error: FactGameOutcomes table does not exist")
             return None
         
-        query = """
-        SELECT 
-            t.team_id,
-            COUNT(*) AS games_played,
-            SUM(CASE WHEN (g.visiting_team_id = t.team_id AND g.visiting_win = 1) OR 
-                        (g.home_team_id = t.team_id AND g.home_win = 1) THEN 1 ELSE 0 END) AS wins,
-            SUM(CASE WHEN (g.visiting_team_id = t.team_id AND g.visiting_win = 0 AND g.tie = 0) OR 
-                        (g.home_team_id = t.team_id AND g.home_win = 0 AND g.tie = 0) THEN 1 ELSE 0 END) AS losses,
-            SUM(g.tie) AS ties,
-            SUM(CASE WHEN g.visiting_team_id = t.team_id THEN g.visiting_runs ELSE g.home_runs END) AS runs_scored,
-            SUM(CASE WHEN g.visiting_team_id = t.team_id THEN g.home_runs ELSE g.visiting_runs END) AS runs_allowed,
-            ROUND(AVG(g.attendance)) AS avg_attendance
-        FROM DimTeam t
-        JOIN FactGameOutcomes g ON t.team_id IN (g.visiting_team_id, g.home_team_id)
-        WHERE t.team_id = ?
-        """
-        
-        params = [team_id]
         if season:
-            query += " AND g.season = ?"
-            params.append(season)
-            
-        query += " GROUP BY t.team_id;"
-        
-        results = self.execute_query(query, params)
+            params = [team_id, season, team_id, season]
+            results = self.execute_query(TEAM_PERFORMANCE_BY_SEASON_SQL, params)
+        else:
+            results = self.execute_query(TEAM_PERFORMANCE_SQL, [team_id, team_id])
         return dict(results[0]) if results else None
 
 
@@ -12,7 +12,7 @@ class BaseballAnalyzer:
         self.db_path = db_path
     
     def run_analysis(self):
-        """Run two key analyses without date joins"""
+        """Run two key analyses from the pre-aggregated player tables"""
         self.plot_top_batters()
         self.plot_pitching_performance()
         plt.show()
@@ -26,14 +26,14 @@ class BaseballAnalyzer:
             query = """
             SELECT 
                 p.player_name,
-                SUM(b.at_bats) AS at_bats,
-                SUM(b.hits) AS hits,
-                ROUND(SUM(b.hits)*1.0/SUM(b.at_bats), 3) AS batting_avg
-            FROM FactBatting b
-            JOIN DimPlayer p ON b.player_id = p.player_id
-            WHERE b.at_bats > 0
-            GROUP BY p.player_id
-            HAVING SUM(b.at_bats) > 100
+                b.at_bats,
+                b.hits,
+                ROUND(b.hits*1.0/b.at_bats, 3) AS batting_avg
+            FROM AggPlayerBatting b
+            -- DimPlayer can hold several rows per player, so pick one name each
+            JOIN (SELECT player_id, MIN(player_name) AS player_name FROM DimPlayer GROUP BY player_id) p
+                ON b.player_id = p.player_id
+            WHERE b.at_bats > 100
             ORDER BY batting_avg DESC
             LIMIT 10;
             """
@@ -58,16 +58,14 @@ class BaseballAnalyzer:
         with sqlite3.connect(self.db_path) as conn:
             query = """
             SELECT 
-                pl.player_name,  -- Changed from p.player_name to pl.player_name
-                SUM(p.outs_recorded)/3.0 AS innings_pitched,
-                SUM(p.earned_runs) AS earned_runs,
-                CASE WHEN SUM(p.outs_recorded) > 0 
-                     THEN 9*SUM(p.earned_runs)/(SUM(p.outs_recorded)/3.0) 
-                     ELSE 0 END AS ERA
-            FROM FactPitching p
-            JOIN DimPlayer pl ON p.player_id = pl.player_id  -- Correct alias used
-            GROUP BY pl.player_id
-            HAVING SUM(p.outs_recorded) >= 30
+                pl.player_name,
+                p.outs_recorded/3.0 AS innings_pitched,
+                p.earned_runs,
+                9*p.earned_runs/(p.outs_recorded/3.0) AS ERA
+            FROM AggPlayerPitching p
+            JOIN (SELECT player_id, MIN(player_name) AS player_name FROM DimPlayer GROUP BY player_id) pl
+                ON p.player_id = pl.player_id
+            WHERE p.outs_recorded >= 30
             ORDER BY ERA ASC
             LIMIT 15;
             """
@@ -0,0 +1,63 @@
+import importlib.util
+import os
+import sqlite3
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+# The pipeline scripts have numbered file names, so load 1.2_Load.py by path
+_spec = importlib.util.spec_from_file_location(
+    "load", os.path.join(os.path.dirname(__file__), os.pardir, "1.2_Load.py")
+)
+load = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(load)
+
+
+def _column_types(conn, table_name):
+    return {row[1]: row[2] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+
+
+def test_arrow_loader_matches_pandas_types(tmp_path):
+    csv_file = tmp_path / "gameinfo.csv"
+    csv_file.write_text(
+        "gid,att,innings,temp,date,flag,empty\n"
+        "g1,7002,9,,2023-04-01,true,\n"
+        "g2,,10,71.5,2023-04-02,false,\n"
+        "g3,31000,9,64,2023-04-03,,\n"
+    )
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.execute("BEGIN")
+    row_count = load._load_csv_arrow(conn, str(csv_file), "gameinfo", "replace")
+    conn.commit()
+
+    assert row_count == 3
+    assert _column_types(conn, "gameinfo") == {
+        "gid": "TEXT",
+        "att": "REAL",
+        "innings": "INTEGER",
+        "temp": "REAL",
+        "date": "TEXT",
+        "flag": "INTEGER",
+        "empty": "REAL",
+    }
+    rows = conn.execute("SELECT * FROM gameinfo ORDER BY gid").fetchall()
+    assert rows[0] == ("g1", 7002.0, 9, None, "2023-04-01", 1, None)
+    assert rows[1] == ("g2", None, 10, 71.5, "2023-04-02", 0, None)
+    assert isinstance(rows[0][1], float)
+    assert isinstance(rows[0][2], int)
+    conn.close()
+
+
+def test_arrow_loader_slices_large_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(load, "CHUNK_SIZE", 2)
+    csv_file = tmp_path / "batting.csv"
+    csv_file.write_text("id,h\n" + "".join(f"p{i},{i}\n" for i in range(7)))
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.execute("BEGIN")
+    row_count = load._load_csv_arrow(conn, str(csv_file), "batting", "replace")
+    conn.commit()
+
+    assert row_count == 7
+    assert conn.execute("SELECT SUM(h) FROM batting").fetchone() == (21,)
+    conn.close()